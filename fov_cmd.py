@@ -72,17 +72,47 @@ Other options:
 import os
 import sys
 import pprint
+import numpy
+import collections
 import sqlite3 as sl3
 import spiceypy as sp
 import gaiaif_util as gifu
 
-dpr = sp.dpr()
+dpr = sp.dpr()                                       ### degree / Radian
+rpd = sp.rpd()                                       ### Radian / degree
 
 ### Allowed magnitude types
 magtypes = set('g bp rp'.split())
 
 do_debug = 'DEBUG' in os.environ
 
+### Counts of rows per batch tested against the FOV:  first batch, and
+### upper limit of later batches sized from the FOV acceptance rate
+batch_size = 512
+max_batch_size = 1 << 16
+
+### Columns, and their NumPy types, copied from each batch of rows into
+### a structured array; columns not in the query are omitted
+### - float32 magnitude and parallax:  parallax correction is at most
+###   ~1arcsec, so float32 relative error is well below 1e-12 radian
+### - float64 RA, Dec and PM:  float32 RA,Dec would be ~0.04arcsec, and
+###   PM times obs_year accumulates
+batch_fields = (('mean_mag',numpy.float32)
+               ,('ra',numpy.float64)
+               ,('dec',numpy.float64)
+               ,('parallax',numpy.float32)
+               ,('pmra',numpy.float64)
+               ,('pmdec',numpy.float64)
+               ,)
+
+### Process-wide cache of read-only connections to Gaia SQLite3 DB
+### files, keyed by (light DB path,heavy DB path or None); each call to
+### gaiaif() gets a fresh cursor; cf. get_connection() below
+connection_cache = dict()
+
+### Cache of GAIASQL query text, keyed by query shape; cf. GAIASQL
+query_cache = dict()
+
 
 ########################################################################
 def gaiaif(fov_vertices
@@ -159,61 +189,96 @@ Keywords:
   ### Will need gaialight table if either proper motions were requested,
   ### or if either parallax or proper motion corrections were requested
   ppm_final = ppm or not ((None,None,) == (obs_pos,obs_year,))
-  gaiasqls = [GAIASQL(gaia_sl3,magmin,magmax,mag_type
-                     ,ppm_final,mags,heavy
-                     ,*radeclims
-                     )
-              for radeclims in fov.get_radec_boxes()
-             ]
+  ### Single query of all RA,Dec boxes; SQLite merges the boxes' rows
+  ### by magnitude
+  gaiasql = GAIASQL(gaia_sl3,magmin,magmax,mag_type
+                   ,ppm_final,mags,heavy
+                   ,fov.get_radec_boxes()
+                   ,cap=max(rtn_limit*4,64)
+                   )
 
   if do_debug:
     pprint.pprint(locals(),stream=sys.stderr)
     sys.stderr.write('========\n')
-    for gaiasql in gaiasqls: sys.stderr.write(gaiasql.query)
+    sys.stderr.write(gaiasql.query)
     sys.stderr.write('\n========\n')
 
+  ### Structured dtype for batches of queried columns
+  batch_dtype = numpy.dtype([field for field in batch_fields
+                             if field[0] in gaiasql.column_names
+                            ])
+
+  ### Keys of returned star dicts:  PPM columns, None if not queried;
+  ### other queried columns; corrections
+  ppm_keys = ('parallax','pmra','pmdec',)
+  other_keys = tuple(key for key in gaiasql.column_names if key not in ppm_keys)
+  rtn_keys = ppm_keys + other_keys + ('uvstar_corrected'
+                                     ,'rastar_corrected','decstar_corrected'
+                                     ,'rastar_delta','decstar_delta'
+                                     ,)
+  if ppm_final: ppm_nones,row_keys = (),ppm_keys+other_keys
+  else        : ppm_nones,row_keys = (None,None,None,),other_keys
+
+  ### Column indices into rows; sqlite3.Row lookup by name is a scan
+  column_index = gaiasql.column_names.index
+  batch_indices = [column_index(key) for key in batch_dtype.names]
+  row_indices = [column_index(key) for key in row_keys]
+  ira,idec = column_index('ra'),column_index('dec')
+  isource_id = 'source_id' in rtn_keys and rtn_keys.index('source_id')
+
   ### Initialize list of stars that are in FOV
   rtn_stars = list()
+  ntested = 0
 
-  ### Loop over stars
+  ### Loop over batches of stars, in order of increasing magnitude
   while len(rtn_stars) < rtn_limit:
 
-    minmag_row = dict(parallax=None
-                     ,pmra=None
-                     ,pmdec=None
-                     )
-    minmag_gsql = None
-
-    for row,gsql in [gaiasql.get_row() for gaiasql in gaiasqls]:
-      if None is row: continue
-      if not (None is minmag_gsql):
-        if row['mean_mag'] >= minmag_row['mean_mag']: continue
-      minmag_row.update(row)
-      minmag_gsql = gsql
-
-    if None is minmag_gsql: break
-
-    star_in_fov,uvstar = fov.star_in_fov([minmag_row['ra'],minmag_row['dec']]
-                                        ,parallax_maspau=minmag_row['parallax']
-                                        ,pmra_maspy=minmag_row['pmra']
-                                        ,pmdec_maspy=minmag_row['pmdec']
-                                        )
-
-    if star_in_fov:
-
-      minmag_row['uvstar_corrected'] = list(uvstar)
-      (minmag_row['rastar_corrected']
-      ,minmag_row['decstar_corrected']
-      ,) = sp.vsclg(dpr,sp.recrad(uvstar)[1:3],2)
-      (minmag_row['rastar_delta']
-      ,minmag_row['decstar_delta']
-      ,) = (minmag_row['rastar_corrected'] - minmag_row['ra']
-           ,minmag_row['decstar_corrected'] - minmag_row['dec']
-           ,)
-
-      rtn_stars.append(minmag_row)
-
-    minmag_gsql.cursor_next()
+    ### Get batch of sqlite3.Row rows
+    rows = gaiasql.get_rows()[0]
+    if not rows: break
+
+    ### Copy batch columns into structured array; None becomes NaN
+    batch = numpy.fromiter((tuple(row[i] for i in batch_indices) for row in rows)
+                          ,dtype=batch_dtype
+                          ,count=len(rows)
+                          )
+
+    ### Test the whole batch against the FOV; columns that were not
+    ### queried become None
+    in_fovs,uvstars = fov.stars_in_fov(*[(batch[key] if key in batch_dtype.names else None)
+                                         for key in 'ra dec parallax pmra pmdec'.split()
+                                        ])
+
+    iins = numpy.nonzero(in_fovs)[0][:rtn_limit-len(rtn_stars)]
+    uvouts = uvstars[iins]
+
+    ### Corrected RA,Dec of accepted stars, degrees; cf. sp.recrad
+    rastars = numpy.arctan2(uvouts[:,1],uvouts[:,0])
+    rastars = dpr * numpy.where(rastars < 0.0,rastars + (2.0*numpy.pi),rastars)
+    decstars = dpr * numpy.arctan2(uvouts[:,2],numpy.hypot(uvouts[:,0],uvouts[:,1]))
+
+    for iin,uvstar,rastar,decstar in zip(iins,uvouts.tolist(),rastars.tolist(),decstars.tolist()):
+
+      ### Convert only stars in FOV to dicts, built once from values
+      row = rows[iin]
+      values = list(ppm_nones) + [row[i] for i in row_indices]
+      if isource_id: values[isource_id] = str(values[isource_id])
+      values += [uvstar
+                ,rastar,decstar
+                ,rastar - row[ira],decstar - row[idec]
+                ]
+
+      rtn_stars.append(dict(zip(rtn_keys,values)))
+
+    ### Size later fetches from acceptance rate so far, with 50% margin;
+    ### the row buffer is already filled, so this applies to the batch
+    ### after the next
+    ntested += len(rows)
+    need = 1.5 * (rtn_limit - len(rtn_stars)) * ntested / max(len(rtn_stars),1)
+    gaiasql.cursor.arraysize = int(min(max(need,batch_size),max_batch_size))
+
+  ### Close cursor; connection stays open for the next query
+  gaiasql.close()
 
   return dict(config=dict(limit=rtn_limit
                          ,magmin=magmin
@@ -238,82 +303,115 @@ Keywords:
              )
 
 
-########################################################################
-def do_main(argv):
-  """Process command line, the call gaiaif(...)"""
-
-  ######################################################################
-  ### Process command-line
-
-  fov_vertices = []
 
-  kwargs = dict()
+########################################################################
+def gaiaif_batch(centers,shape,**kwargs):
+  """
+Generator of gaiaif(...) results for FOVs of one shape at many centers
 
-  for arg in argv:
-    ### - Loop over arguments
+Sample usage:
 
-    if arg.startswith('--ralohi='):
-      kwargs['ralohi'] = (ralo,rahi,) = list(map(float,arg[9:].split(',')))
-      continue
+  import fov_cmd
+  for result in fov_cmd.gaiaif_batch([[10,-45],[12,-43]],0.3):
+    ...                                 ### Conical FOVs, .3deg half-angle
+  for result in fov_cmd.gaiaif_batch(centers
+                                    ,[[-.1,-.1],[.1,-.1],[.1,.1]]):
+    ...                                 ### Triangular FOVs
 
-    if arg.startswith('--declohi='):
-      kwargs['declohi'] = (declo,dechi,) = list(map(float,arg[10:].split(',')))
-      continue
+Arguments:
 
-    if arg.startswith('--limit='):
-      kwargs['rtn_limit'] = int(arg[8:])
-      continue
+  centers - sequence of [RA,Dec] FOV centers, degrees
+  shape   - Cone half-angle, degrees; or sequence of [RA,Dec] polygon
+            vertices, degrees, of the FOV centered at RA,Dec = 0,0; the
+            polygon is rotated rigidly, so its shape and orientation
+            with respect to north are preserved at each center
+  kwargs  - Keywords for gaiaif(...)
 
-    if arg.startswith('--magmax='):
-      kwargs['magmax'] = float(arg[9:])
-      continue
+The cached Gaia DB connection, and the query text for each query shape,
+are reused for all FOVs, so only the first FOV pays to open the DB
 
-    if arg.startswith('--magmin='):
-      kwargs['magmin'] = float(arg[9:])
+  """
+  try:
+    ### Conical FOV
+    hangdeg,uvvertices = float(shape),None
+  except TypeError:
+    ### Polygonal FOV:  unit vectors of vertices around RA,Dec = 0,0
+    hangdeg = None
+    uvvertices = numpy.array([sp.radrec(1.0,ra*rpd,dec*rpd)
+                              for ra,dec in shape
+                             ])
+
+  for ra,dec in centers:
+    if None is uvvertices:
+      yield gaiaif([[ra,dec],hangdeg],**kwargs)
       continue
 
-    if arg.startswith('--magtype='):
-      kwargs['magtype'] = arg[10:].strip()
-      assert kwargs['magtype'] in magtypes,'Magnitude type argument [{0}] does not specify on of the set of allowed types {1}'.format(arg,magtypes)
-      continue
+    ### Rotate +X to center:  about +Y by -Dec, then about +Z by RA
+    mtx = numpy.array(sp.mxm(sp.rotate(-ra*rpd,3),sp.rotate(dec*rpd,2)))
+    yield gaiaif((uvvertices @ mtx.T).tolist(),**kwargs)
 
-    if arg.startswith('--gaia-sqlite3='):
-      assert arg.endswith('.sqlite3'),'Gaia SQLite3 filepath argument [{0}] does not end in .sqlite3'.format(arg)
-      kwargs['gaia_sl3'] = arg[15:]
-      continue
 
-    if '--j2000' == arg:
-      kwargs['j2000'] = True
-      continue
+########################################################################
+### Command-line argument converters and table for do_main(...)
+def float_list_arg(value): return list(map(float,value.split(',')))
+
+def magtype_arg(value):
+  magtype = value.strip()
+  assert magtype in magtypes,'Magnitude type argument [--magtype={0}] does not specify on of the set of allowed types {1}'.format(value,magtypes)
+  return magtype
+
+def gaia_sl3_arg(value):
+  assert value.endswith('.sqlite3'),'Gaia SQLite3 filepath argument [--gaia-sqlite3={0}] does not end in .sqlite3'.format(value)
+  return value
+
+def radec_buffer_arg(value):
+  sys.stderr.write('Warning:  RA,DEC buffer not yet implemented\n')
+  return float(value)
+
+### Option name => (gaiaif keyword, converter of value after '=');
+### converter None is a flag without a value, which sets keyword True
+arg_table = {'--ralohi':('ralohi',float_list_arg)
+            ,'--declohi':('declohi',float_list_arg)
+            ,'--limit':('rtn_limit',int)
+            ,'--magmax':('magmax',float)
+            ,'--magmin':('magmin',float)
+            ,'--magtype':('magtype',magtype_arg)
+            ,'--gaia-sqlite3':('gaia_sl3',gaia_sl3_arg)
+            ,'--j2000':('j2000',None)
+            ,'--ppm':('ppm',None)
+            ,'--mags':('mags',None)
+            ,'--heavy':('heavy',None)
+            ,'--buffer':('radec_buffer',radec_buffer_arg)
+            ,'--obspos':('obs_pos',float_list_arg)
+            ,'--obsvel':('obs_vel',float_list_arg)
+            ,'--obsy':('obs_year_arg',str)
+            }
 
-    if '--ppm' == arg:
-      kwargs['ppm'] = True
-      continue
 
-    if '--mags' == arg:
-      kwargs['mags'] = True
-      continue
+########################################################################
+def do_main(argv):
+  """Process command line, the call gaiaif(...)"""
 
-    if '--heavy' == arg:
-      kwargs['heavy'] = True
-      continue
+  ######################################################################
+  ### Process command-line
 
-    if arg.startswith('--buffer='):
-      kwargs['radec_buffer'] = float(arg[9:])
-      sys.stderr.write('Warning:  RA,DEC buffer not yet implemented\n')
-      continue
+  fov_vertices = []
 
-    if arg.startswith('--obspos='):
-      kwargs['obs_pos'] = list(map(float,arg[9:].split(',')))
-      continue
+  kwargs = dict()
 
-    if arg.startswith('--obsvel='):
-      kwargs['obs_vel'] = list(map(float,arg[9:].split(',')))
-      continue
+  for arg in argv:
+    ### - Loop over arguments
 
-    if arg.startswith('--obsy='):
-      kwargs['obs_year_arg'] = arg[7:]
-      continue
+    ### - Look up --name=value or --name options in arg_table
+    name,eq,value = arg.partition('=')
+    if name in arg_table:
+      kwarg,converter = arg_table[name]
+      if eq and converter:
+        kwargs[kwarg] = converter(value)
+        continue
+      if not (eq or converter):
+        kwargs[kwarg] = True
+        continue
 
     vertex = arg.split(',')
     if 1==len(vertex): vertex = vertex.pop()
@@ -330,26 +428,58 @@ def do_main(argv):
 class GAIASQL(object):
   def __init__(self,gaia_sl3,lomag,himag,magtype
               ,ppm,mags,heavy
-              ,ralo,rahi,declo,dechi
+              ,radec_boxes
+              ,cap=None
               ):
     self.gaia_sl3 = gaia_sl3
     self.gaia_heavy_sl3 = '{0}_heavy.sqlite3'.format(gaia_sl3[:-8])
     (self.lomag,self.himag,self.magtype
     ,self.ppm,self.mags,self.heavy
-    ,self.ralo,self.rahi,self.declo,self.dechi
+    ,self.radec_boxes
     ,) = (lomag,himag,magtype
          ,ppm,mags,heavy
-         ,ralo,rahi,declo,dechi
+         ,[list(radec_box) for radec_box in radec_boxes]
          ,)
     assert self.magtype in magtypes
+    assert self.radec_boxes,'No RA,Dec boxes supplied to GAIASQL'
+
+    ### Parameters :ralo0,:rahi0,:declo0,:dechi0,:ralo1,... for boxes,
+    ### and :cap,:offset for LIMIT,OFFSET, if cap is not None
+    self.query_parameters = dict(lomag=self.lomag,himag=self.himag)
+    self.capped = not (None is cap)
+    if self.capped: self.query_parameters.update(cap=int(cap),offset=0)
+    for ibox,radec_box in enumerate(self.radec_boxes):
+      for name,value in zip('ralo rahi declo dechi'.split(),radec_box):
+        self.query_parameters['{0}{1}'.format(name,ibox)] = value
+
+    ### Query text depends only on query shape, so build it once per
+    ### shape; identical text lets the sqlite3 statement cache of the
+    ### cached connection reuse the prepared statement
+    query_key = (self.magtype,bool(self.ppm),bool(self.mags),bool(self.heavy)
+                ,None is self.lomag,None is self.himag
+                ,len(self.radec_boxes)
+                ,self.capped
+                ,)
+    try: self.query = query_cache[query_key]
+    except KeyError:
+      self.query = query_cache[query_key] = self.build_query()
+
+    self.cursor = get_connection(self.gaia_sl3
+                                ,self.heavy and self.gaia_heavy_sl3 or None
+                                ).cursor()
+    self.cursor.arraysize = batch_size
+    self.cursor.execute(self.query,self.query_parameters)
+    self.column_names = [descs[0] for descs in self.cursor.description]
+    self.done = False
+    self.count = 0
+    self.buffer = collections.deque()
+    self.cursor_next()
 
-    self.query_parameters = dict(lomag=self.lomag
-                                ,himag=self.himag
-                                ,ralo=self.ralo
-                                ,rahi=self.rahi
-                                ,declo=self.declo
-                                ,dechi=self.dechi
-                                )
+  def build_query(self):
+    """Build SQL query text; magnitude limits and RA,Dec boxes are
+named parameters in .query_parameters
+
+"""
     ppm_columns = self.ppm and """
       ,gaialight.parallax
       ,gaialight.pmra
@@ -387,7 +517,7 @@ INNER JOIN dbheavy.gaiaheavy
 SELECT gaialight.phot_{0}_mean_mag as mean_mag
       ,gaialight.ra as ra
       ,gaialight.dec as dec
-      ,gaiartree.idoffset{3}{4}{5}
+      ,gaiartree.idoffset as idoffset{3}{4}{5}
 
 FROM gaiartree
 
@@ -396,16 +526,11 @@ INNER JOIN gaialight
 {1}
 {6}
 
-WHERE gaiartree.ralo <= :rahi
-  AND gaiartree.rahi >= :ralo
-  AND gaiartree.declo <= :dechi
-  AND gaiartree.dechi >= :declo
-{2}
-
-ORDER BY phot_{0}_mean_mag
-
-;
-""".format(self.magtype
+WHERE gaiartree.ralo <= :rahi{{ibox}}
+  AND gaiartree.rahi >= :ralo{{ibox}}
+  AND gaiartree.declo <= :dechi{{ibox}}
+  AND gaiartree.dechi >= :declo{{ibox}}
+{2}""".format(self.magtype
           ,'{extra_join_light_on}'
           ,'{extra_mag_limits}'
           ,ppm_columns
@@ -425,54 +550,120 @@ ORDER BY phot_{0}_mean_mag
       self.extra_join_light_on += """AND gaiartree.lomag <= :himag\n"""
       self.extra_mag_limits += """  AND gaialight.phot_{0}_mean_mag <= :himag\n""".format(self.magtype)
 
-    self.query = self.query0.format(**vars(self))
-    self.cursor = sl3.connect(self.gaia_sl3).cursor()
-    if self.heavy:
-      self.cursor.execute("""ATTACH '{0}' as dbheavy""".format(self.gaia_heavy_sl3))
-    self.cursor.execute(self.query,self.query_parameters)
-    self.column_names = [descs[0] for descs in self.cursor.description]
-    self.use___next = hasattr(self.cursor,'__next__')
-    self.done = False
-    self.count = 0
-    self.cursor_next()
+    ### One SELECT per RA,Dec box, combined with UNION ALL, so SQLite
+    ### does the merge by magnitude in a single sort; idoffset breaks
+    ### ties so successive LIMIT,OFFSET pages are consistent
+    return """
+UNION ALL
+""".join([self.query0.format(ibox=ibox,**vars(self))
+          for ibox in range(len(self.radec_boxes))
+         ]) + """
+ORDER BY mean_mag{0}
+{1}
+;
+""".format(self.capped and ',idoffset' or ''
+          ,self.capped and 'LIMIT :cap OFFSET :offset' or ''
+          )
 
   def get_row(self):
-    if None is self.row:
-      rtn = None
-    else:
-      rtn = dict(zip(self.column_names,tuple(self.row)))
-      if 'source_id' in rtn: rtn['source_id'] = str(rtn['source_id'])
+    """Return current .row, an sqlite3.Row or None, and self"""
+    return self.row,self
 
-    return rtn,self
+  def get_rows(self):
+    """Return list of current .row plus buffered following rows, i.e. up
+to one .fetchmany() of .cursor.arraysize rows, and self; list is empty
+after the last row
+
+"""
+    if None is self.row: return [],self
+    rows = [self.row]
+    rows.extend(self.buffer)
+    self.buffer.clear()
+    self.cursor_next()
+    return rows,self
 
   def cursor_next(self):
-    """Get next .row from cursor"""
+    """Get next .row from .buffer, refilling .buffer from cursor with
+.fetchmany() of .cursor.arraysize rows when it is empty
+
+"""
     assert not self.done,'Incorrect use of GAIASQL class; contact programmer, code WSNBATGH-GAIASQL-0'
-    try:
-      if self.use___next: self.row = self.cursor.__next__()
-      else              : self.row = self.cursor.next()
-      self.count += 1
-    except StopIteration as e:
-      self.close()
-    except:
-      raise
+    if not self.buffer:
+      rows = self.cursor.fetchmany()
+      while (not rows) and self.requery(): rows = self.cursor.fetchmany()
+      if not rows:
+        self.close()
+        return
+      self.count += len(rows)
+      self.buffer.extend(rows)
+    self.row = self.buffer.popleft()
+
+  def requery(self):
+    """If the last query returned :cap rows, re-execute it for the next
+page of rows, with a larger cap; return True if re-executed
+
+"""
+    if not self.capped: return False
+    if self.count < (self.query_parameters['offset'] + self.query_parameters['cap']): return False
+    self.query_parameters['offset'] = self.count
+    self.query_parameters['cap'] *= 4
+    self.cursor.execute(self.query,self.query_parameters)
+    return True
 
   def close(self):
-    """Close DB operations; should be called only at StopIteration"""
+    """Close DB operations; cached connection is not closed"""
     self.row = None
+    if self.done: return
     self.done = True
-    try: cn = self.cursor.connection
-    except: pass
     try: self.cursor.close()
     except: pass
-    try: cn.close()
-    except: pass
+
+
+########################################################################
+def get_connection(gaia_sl3,gaia_heavy_sl3=None):
+  """Get cached read-only connection to Gaia SQLite3 DB file, opening it
+on first use; if gaia_heavy_sl3 is not None, heavy DB file is attached
+to the connection, once, as dbheavy"""
+  key = (gaia_sl3,gaia_heavy_sl3,)
+  try: return connection_cache[key]
+  except KeyError: pass
+
+  ### Open read-only; immutable=1 tells SQLite the catalog file never
+  ### changes, so no locking or change detection is needed
+  cn = sl3.connect('file:{0}?mode=ro&immutable=1'.format(gaia_sl3),uri=True,check_same_thread=False)
+  cn.row_factory = sl3.Row
+  cu = cn.cursor()
+  ### N.B. journal_mode=WAL would require write access to the catalog,
+  ###      and synchronous has no effect on a read-only connection
+  for pragma in ('query_only=1'
+                ,'mmap_size={0}'.format(1<<34)
+                ,'cache_size=-131072'
+                ,'temp_store=MEMORY'
+                ,):
+    cu.execute('PRAGMA {0}'.format(pragma))
+  if not (None is gaia_heavy_sl3):
+    cu.execute("""ATTACH 'file:{0}?mode=ro&immutable=1' as dbheavy""".format(gaia_heavy_sl3))
+  cu.close()
+  connection_cache[key] = cn
+  return cn
 
 
 ########################################################################
 if "__main__" == __name__:
 
-  try: import simplejsonjson as sj
-  except: import json as sj
-  sj.dump(do_main(sys.argv[1:]),sys.stdout,indent=2)
+  try: import orjson
+  except: orjson = None
+
+  result = do_main(sys.argv[1:])
+
+  if orjson:
+    ### C-implemented JSON encoder, same layout as json indent=2
+    sys.stdout.flush()
+    sys.stdout.buffer.write(orjson.dumps(result,option=orjson.OPT_INDENT_2|orjson.OPT_SERIALIZE_NUMPY))
+  else:
+    ### Fallback:  compact separators, unless debugging
+    try: import simplejsonjson as sj
+    except: import json as sj
+    if do_debug: sj.dump(result,sys.stdout,indent=2)
+    else       : sj.dump(result,sys.stdout,separators=(',',':'))
   sys.stdout.write('\n')
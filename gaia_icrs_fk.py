@@ -27,6 +27,11 @@ Usage
       CALL FURNSH('gaia_icrs_tk.py')
       CALL PXFORM('ICRS','J2000',0.0,MTX_ICRS_TO_J2000)
 
+- Python module:
+
+      import gaia_icrs_fk
+      mtx_icrs_to_j2000 = gaia_icrs_fk.icrs_to_j2k()
+
 - Python script (BASH command line, with % as prompt):
 
       % [DEBUG=] python gaia_icrs_fk.py && echo Success || echo Failed
@@ -122,75 +127,99 @@ Python script
 =============
 
 The rest of the lines in this file, after this docsstring, conmprise a
-test of these data, written in Python; https://www.python.org/
+precomputed ICRS to J2000 rotation matrix, and a test of these data and
+of that matrix, written in Python; https://www.python.org/
+
+The test runs only when this file is run as a script, or when imported
+with DEBUG in the environment; it requires astropy.
 
 """
 import os
 import sys
+import numpy
 import spiceypy as sp
-from astropy.coordinates import SkyCoord
 
 do_debug = 'DEBUG' in os.environ
 
-### Conversion factor:  milliarcsecond/radian = mas/deg * deg/rad
-maspr = 3.6e6 * sp.dpr()
+### ICRS to J2000 rotation matrix, precomputed by part II below
+ICRS_TO_J2K = numpy.array([[ 0.9999999999999253, 3.7815467126542787e-07, 8.047907106418288e-08]
+                          ,[-3.7815467391860897e-07, 0.999999999999928, 3.296733031544833e-08]
+                          ,[-8.047905859742714e-08,-3.2967360748982745e-08, 0.9999999999999962]
+                          ])
 
 
 ########################################################################
-### I.  Test the methodology
-########################################################################
+def icrs_to_j2k():
+  """Return copy of precomputed ICRS to J2000 rotation matrix"""
+  return ICRS_TO_J2K.copy()
 
-### Astropy provides FK5 Pole and Equinox vectors in ICRS frame;
-### SPICE TWOVEC creates rotation matrix from those two vectors
-fk5_z_in_icrs_astropy = SkyCoord(frame='fk5',x=0,y=0,z=1,representation_type='cartesian').icrs.cartesian.xyz.value
-fk5_x_in_icrs_astropy = SkyCoord(frame='fk5',x=1,y=0,z=0,representation_type='cartesian').icrs.cartesian.xyz.value
-icrs_to_fk5_astropy = sp.twovec(fk5_z_in_icrs_astropy,3,fk5_x_in_icrs_astropy,1)
-###
-### FK5 Pole vector, +Z, wrt ICRS Pole vector:
-### 1) 19.9mas toward 18h => +19.9mas around +X => rotate frame -19.9mas around +X
-### 2)  9.1mas toward 00h => + 9.1mas around +Y => rotate frame - 9.1mas around +Y
-### FK5 Equinox wrt ICRS Equinox:
-### 3) 22.9mas toward 180 => -22.9mas around +Z => rotate frame +22.9mas around +Z
-### SPICE MXM and XPOSE creates rotation matrix combining those rotations
-fk5_to_icrs_199x = sp.rotate(-19.9/maspr,1)
-fk5_to_icrs_091y = sp.rotate(- 9.1/maspr,2)
-fk5_to_icrs_229z = sp.rotate(+22.9/maspr,3)
-icrs_to_fk5_rots = sp.xpose(sp.mxm(sp.mxm(fk5_to_icrs_229z,fk5_to_icrs_091y),fk5_to_icrs_199x))
-
-assert 2e-14>abs((icrs_to_fk5_rots-icrs_to_fk5_astropy)/icrs_to_fk5_astropy).max()
 
+if "__main__" == __name__ or do_debug:
 
-########################################################################
-### II. Use same methodology to generate ICRS to J2000 rotation matrix
-########################################################################
+  from astropy.coordinates import SkyCoord
 
-j2k_to_icrs_068x = sp.rotate(- 6.8/maspr,1)
-j2k_to_icrs_166y = sp.rotate(+16.6/maspr,2)
-j2k_to_icrs_780z = sp.rotate(-78.0/maspr,3)
-icrs_to_j2k_rots = sp.xpose(sp.mxm(sp.mxm(j2k_to_icrs_780z,j2k_to_icrs_166y),j2k_to_icrs_068x))
+  ### Conversion factor:  milliarcsecond/radian = mas/deg * deg/rad
+  maspr = 3.6e6 * sp.dpr()
 
 
-########################################################################
-### III. Get the transform from the FK data in the docstring above
-########################################################################
+  ########################################################################
+  ### I.  Test the methodology
+  ########################################################################
+
+  ### Astropy provides FK5 Pole and Equinox vectors in ICRS frame;
+  ### SPICE TWOVEC creates rotation matrix from those two vectors
+  fk5_z_in_icrs_astropy = SkyCoord(frame='fk5',x=0,y=0,z=1,representation_type='cartesian').icrs.cartesian.xyz.value
+  fk5_x_in_icrs_astropy = SkyCoord(frame='fk5',x=1,y=0,z=0,representation_type='cartesian').icrs.cartesian.xyz.value
+  icrs_to_fk5_astropy = sp.twovec(fk5_z_in_icrs_astropy,3,fk5_x_in_icrs_astropy,1)
+  ###
+  ### FK5 Pole vector, +Z, wrt ICRS Pole vector:
+  ### 1) 19.9mas toward 18h => +19.9mas around +X => rotate frame -19.9mas around +X
+  ### 2)  9.1mas toward 00h => + 9.1mas around +Y => rotate frame - 9.1mas around +Y
+  ### FK5 Equinox wrt ICRS Equinox:
+  ### 3) 22.9mas toward 180 => -22.9mas around +Z => rotate frame +22.9mas around +Z
+  ### SPICE MXM and XPOSE creates rotation matrix combining those rotations
+  fk5_to_icrs_199x = sp.rotate(-19.9/maspr,1)
+  fk5_to_icrs_091y = sp.rotate(- 9.1/maspr,2)
+  fk5_to_icrs_229z = sp.rotate(+22.9/maspr,3)
+  icrs_to_fk5_rots = sp.xpose(sp.mxm(sp.mxm(fk5_to_icrs_229z,fk5_to_icrs_091y),fk5_to_icrs_199x))
+
+  assert 2e-14>abs((icrs_to_fk5_rots-icrs_to_fk5_astropy)/icrs_to_fk5_astropy).max()
+
+
+  ########################################################################
+  ### II. Use same methodology to generate ICRS to J2000 rotation matrix
+  ########################################################################
+
+  j2k_to_icrs_068x = sp.rotate(- 6.8/maspr,1)
+  j2k_to_icrs_166y = sp.rotate(+16.6/maspr,2)
+  j2k_to_icrs_780z = sp.rotate(-78.0/maspr,3)
+  icrs_to_j2k_rots = sp.xpose(sp.mxm(sp.mxm(j2k_to_icrs_780z,j2k_to_icrs_166y),j2k_to_icrs_068x))
+
+
+  ########################################################################
+  ### III. Get the transform from the FK data in the docstring above
+  ########################################################################
+
+  sp.furnsh(__file__)
+  icrs_to_j2k_fk = sp.pxform('icrs','j2000',0.0)
+  sp.unload(__file__)
+
+  ### Calculate the difference
+  frac_diff=(icrs_to_j2k_fk-icrs_to_j2k_rots) / icrs_to_j2k_rots
+
+  ### Output if requested
+  if do_debug:
+    import pprint
+    pprint.pprint(dict(icrs_to_j2k_rots=icrs_to_j2k_rots*maspr
+              ,icrs_to_j2k_fk=icrs_to_j2k_fk*maspr
+              ,j2k_x_in_icrs=sp.mtxv(icrs_to_j2k_rots,[1,0,0])*maspr
+              ,j2k_z_in_icrs=sp.mtxv(icrs_to_j2k_rots,[0,0,1])*maspr
+              ,frac_diff=frac_diff
+              )
+       )
+
+  ### Test the maximum difference
+  assert 2e-14>abs(frac_diff).max()
 
-sp.furnsh(__file__)
-icrs_to_j2k_fk = sp.pxform('icrs','j2000',0.0)
-sp.unload(__file__)
-
-### Calculate the difference
-frac_diff=(icrs_to_j2k_fk-icrs_to_j2k_rots) / icrs_to_j2k_rots
-
-### Output if requested
-if do_debug:
-  import pprint
-  pprint.pprint(dict(icrs_to_j2k_rots=icrs_to_j2k_rots*maspr
-            ,icrs_to_j2k_fk=icrs_to_j2k_fk*maspr
-            ,j2k_x_in_icrs=sp.mtxv(icrs_to_j2k_rots,[1,0,0])*maspr
-            ,j2k_z_in_icrs=sp.mtxv(icrs_to_j2k_rots,[0,0,1])*maspr
-            ,frac_diff=frac_diff
-            )
-     )
-
-### Test the maximum difference
-assert 2e-14>abs(frac_diff).max()
+  ### Test the precomputed matrix
+  assert 2e-14>abs((ICRS_TO_J2K-icrs_to_j2k_rots) / icrs_to_j2k_rots).max()
@@ -4,6 +4,9 @@ import math
 import numpy
 import spiceypy as sp
 
+try: import numba
+except: numba = None
+
 try: dpr
 except:
   dpr = sp.dpr()                                       ### degree / Radian
@@ -34,7 +37,8 @@ Attributes
 .mtxtofov   Rotation matrix from inertial frame to local reference frame
 .uvlclxyzs  Vertices in local reference frame (reffrm), unit vectors
 .uvavg      Mean vector of all vertices, will be +Z of local reffrm
-.localxyzs  Verts in local reffrm, on plane Z=+1, w/stellar aberration
+.bounding_min_cosine  Cosine of bounding cone half-angle around .uvavg
+.localxyzs  Verts in local reffrm, on plane Z=+1; non-convex FOV only
 
 """
   (CIRCLETYPE,RADECBOXTYPE,POLYGONTYPE
@@ -84,6 +88,21 @@ Arguments
     ,self.obs_year
     ,)= fovraws,list(ralohi),list(declohi),obs_pos,obs_vel,obs_year
     self.L = len(fovraws)
+
+    ### Per-star correction factors that depend only on the observer;
+    ### None if the corresponding correction is not applied
+    ### - Proper motion:  radian/mas * y
+    ### - Parallax:  observer position * AU/km * radian/mas
+    ### - Stellar aberration:  observer velocity / speed of light
+    self._pm_scale = None if None is obs_year else obs_year*rpmas
+    self._parallax_scale_vec = None if None is obs_pos else tuple(aupkm*rpmas*c for c in obs_pos)
+    self._aberr_vec = None if None is obs_vel else tuple(recip_clight*c for c in obs_vel)
+    ### - Bounds, degrees, on Dec shift from corrections:  margin for
+    ###   aberration; per mas/y of PM; per mas/AU of parallax
+    self._dec_margin = 0.01 if None is obs_vel else 0.01 + dpr*math.sqrt(sum(c*c for c in self._aberr_vec))
+    self._dec_pm_scale = 0.0 if None is obs_year else dpr*abs(self._pm_scale)
+    self._dec_parallax_scale = 0.0 if None is obs_pos else dpr*math.sqrt(sum(c*c for c in self._parallax_scale_vec))
+
     assert (1<self.L and not (self.ralohi+self.declohi)
       ) or (0==self.L and 2==len(self.ralohi) and 2==len(self.declohi)
       ), 'Invalid vertices in FOV'
@@ -94,8 +113,6 @@ Arguments
     self.radecdegs = list()
     self.fovtype = 1<self.L and FOV.POLYGONTYPE or FOV.RADECBOXTYPE
     self.uvfovxyzs,fovsum = list(),sp.vpack(0.,0.,0.)
-    self.radec_boxes = list()
-    rdba = self.radec_boxes.append   ### Shorthand to append box to list
 
     ################################
     ### Parse list of vertices:
@@ -115,7 +132,7 @@ Arguments
           assert self.hangdeg > 0.0,'Cone half-angle is not greater than 0degrees'
           self.hangrad = self.hangdeg * rpd
           self.min_cosine = math.cos(self.hangrad)
-          self.uv_cone_axis = self.uvfovxyzs[0]
+          self.uv_cone_axis = numpy.array(self.uvfovxyzs[0],dtype=numpy.float64)
           self.fovtype = FOV.CIRCLETYPE
           break
         except AssertionError as e:
@@ -134,7 +151,7 @@ Arguments
 
     ################################
     ### Calculate RA,DEC limits as list of [ralo,rahi,declo,dechi] boxes
-    ### - .radec_boxes is a list; rdba is .radec_boxes.append
+    ### - Boxes are built in local list boxes, assigned to .radec_boxes
     ### - List will have multiple RA,Dec boxes if FOV crosses the Prime
     ###   Meridian (PM) an even number of times.
 
@@ -145,16 +162,16 @@ Arguments
         ralo,rahi = sorted(ras)
         declo,dechi = sorted(decs)
         if 180 > (rahi-ralo):
-          rdba([ralo,rahi,declo,dechi])
+          boxes = [[ralo,rahi,declo,dechi]]
         else:
-          rdba([0.0,ralo,declo,dechi])
-          rdba([rahi,360.0,declo,dechi])
+          boxes = [[0.0,ralo,declo,dechi],[rahi,360.0,declo,dechi]]
       else:
         if self.ralohi[1] > self.ralohi[0]:
-          rdba(self.ralohi+self.declohi)
+          boxes = [self.ralohi+self.declohi]
         else:
-          rdba([self.ralohi[0],360.0]+self.declohi)
-          rdba([0.0,self.ralohi[1]]+self.declohi)
+          boxes = [[self.ralohi[0],360.0]+self.declohi
+                  ,[0.0,self.ralohi[1]]+self.declohi
+                  ]
 
     elif self.fovtype == FOV.CIRCLETYPE:
       ### Circular FOV:  DEC limits determine RA limits; handle PM Xing
@@ -174,24 +191,27 @@ Arguments
       else:
         ### The FOV excludes the poles; calculate the RA range, using
         ### the formula validated in script validate_delta_ra_formula.py
-        tanhang,tandec = math.tan(self.hangrad),math.tan(dec*rpd)
-        sinhang,cosdec = math.sin(self.hangrad),math.cos(dec*rpd)
-        coshang = math.cos(self.hangrad)
+        ### - Sines and cosines once; tangents from their ratios
+        sinhang,coshang = math.sin(self.hangrad),math.cos(self.hangrad)
+        sindec,cosdec = math.sin(dec*rpd),math.cos(dec*rpd)
+        tanhang,tandec = sinhang/coshang,sindec/cosdec
         T = sinhang / math.sqrt(1.0 - ((tanhang*tandec)**2))
         deltara = dpr * math.atan(T / (cosdec * coshang))
         fovralo,fovrahi = ra-deltara,ra+deltara
 
+      ### Dec band of FOV, degrees, for scalar pre-filter in .star_in_fov
+      self._dec_min,self._dec_max = fovdeclo,fovdechi
+
       ### Ensure RA limits are within range [0:360] (N.B. inclusive)
       if fovralo < 0.0: fovralo += 360.0
       if fovrahi > 360.0: fovrahi -= 360.0
 
       if fovralo <= fovrahi:
         ### RA lo <= RA hi:  no PM crosssing
-        rdba([fovralo,fovrahi,fovdeclo,fovdechi])
+        boxes = [[fovralo,fovrahi,fovdeclo,fovdechi]]
       else:
         ### RA hi < RA hi:  there is a PM crosssing
-        rdba([0.0,fovrahi,fovdeclo,fovdechi])
-        rdba([fovralo,360.,fovdeclo,fovdechi])
+        boxes = [[0.0,fovrahi,fovdeclo,fovdechi],[fovralo,360.,fovdeclo,fovdechi]]
 
     else:
       assert self.fovtype == FOV.POLYGONTYPE
@@ -206,23 +226,29 @@ Arguments
       ###   parallel to any side of the polygon
       ### - Start with temporary matrix with +Z as defined above; +X
       ###   toward vertex at largest angle from .uvavg
-      vother = min([(sp.vdot(self.uvavg,v),list(v),) for v in self.uvfovxyzs])[1]
+      uvfovxyzs_arr = numpy.array(self.uvfovxyzs,dtype=numpy.float64)
+      dots = uvfovxyzs_arr @ self.uvavg
+      ### - Ensure all vertices are in the same hemisphere
+      assert (0.0 < dots).all(),'All vertices are not in the same hemisphere'
+      iother = dots.argmin()
+      vother = uvfovxyzs_arr[iother]
       tmpmtx = sp.twovec(self.uvavg,3,vother,1)
+      ### - Bounding cone around .uvavg contains all vertices, so it
+      ###   also contains the polygon; pad cosine for roundoff
+      self.bounding_min_cosine = dots[iother] - 1e-12
       ### - Rotate all vectors to that frame; scale Z components to 1.0
-      vtmps = list()
-      for v in self.uvfovxyzs:
-        ### - Ensure all vertices are in the same hemisphere
-        assert 0.0 < sp.vdot(self.uvavg,v),'All vertices are not in the same hemisphere'
-        vtmp = sp.mxv(tmpmtx,v)
-        vtmps.append(sp.vscl(1.0/vtmp[2],vtmp))
+      vtmps = uvfovxyzs_arr @ numpy.asarray(tmpmtx).T
+      vtmps /= vtmps[:,2:3]
 
       ### Find largest azimuth gap between any two sides:  that azimuth
       ###   will be direction of +X in the final rotation matrix
-      ### - Get azimuths of all sides of polygon, in range [-PI:PI]
-      azimuths,vlast = list(),vtmps[-1]
-      for v in self.uvfovxyzs:
-        azimuths.append(numpy.arctan((v[1]-vlast[1])/(v[0]-vlast[0])))
-        vlast = v
+      ### - Get azimuths of all sides of polygon, projected onto Z=1 in
+      ###   temporary frame, in range [0:PI); a side and its reverse are
+      ###   the same direction for this purpose
+      azimuths,(vlastx,vlasty,_) = list(),vtmps[-1]
+      for vx,vy,_ in vtmps.tolist():
+        azimuths.append(math.atan2(vy-vlasty,vx-vlastx) % math.pi)
+        vlastx,vlasty = vx,vy
       ### - Sort angles and add [least angle plus PI] to end of list
       azimuths.sort()
       azimuths.append(azimuths[0]+sp.pi())
@@ -234,11 +260,10 @@ Arguments
       meanaz = azimuths[imaxdaz] + (maxdaz / 2.0)
 
       ### Final matrix:  add rotation of tmpmtx around +Z by that angle
-      self.mtxtofov = sp.mxm(sp.rotate(meanaz,3),tmpmtx)
+      self.mtxtofov = numpy.asarray(sp.mxm(sp.rotate(meanaz,3),tmpmtx),dtype=numpy.float64)
 
       ### Apply final rotation matrix, store results in .uvlclxyzs
-      tmpmtx = sp.twovec(self.uvavg,3,vother,1)
-      self.uvlclxyzs = [self.rotate_to_local(v) for v in self.uvfovxyzs]
+      self.uvlclxyzs = uvfovxyzs_arr @ self.mtxtofov.T
 
       ### Calculate upper and lower RA and Dec limits, with PM crossings
       los,his = list(),list()
@@ -357,72 +382,72 @@ Arguments
       ### To here, we have list of FOV(s) and list of range(s); use them
       ### to determine RA,DEC box(es) to use for database query
 
+      boxes = list()
       while subfovs:
 
-        ### Get sub-FOV, sub-range; set last vertex's XYZ
+        ### Get sub-FOV, sub-range
         subfov,(ralo,rahi,declo,dechi,) = subfovs.pop(),subranges.pop()
-        lastxyz = subfov[-1][-1]
-
-        for pair in subfov:
-          ### Each element of subfov comprises (RA,Dec) and vertex XYZ
-          ### - xyz is a unit vector
-          (ra,dec,),xyz = pair
 
-          ### - Adjust RA limits as needed from RA of vertex
-          if   ra > rahi: rahi = ra
-          elif ra < ralo: ralo = ra
-
-          ### - Set Dec extrema from DEC of vertex
-          maxdec = mindec = dec
-
-          ### - Calculate Dec extrema from lastxyz to xyz
-          ### -- Normal to plane of lastxyz and syz
-          sidenormal = sp.vcrss(lastxyz,xyz)
-          ### -- Z-rates along great circle at lastxyz and at xyz
-          lastdz = sp.vcrss(sidenormal,lastxyz)[2]
-          dz = sp.vcrss(sidenormal,xyz)[2]
-          if 0.0 > (lastdz*dz):
-            ### -- If sign of Z-rates differs, there should be an
-            ###    extreme value between lastxyz and xyz
-            ### --- Get vector perpendicular to side normal on equator
-            ### --- Use that to calculate the unit vector at Dec extreme
-            equinox = sp.vcrss([0,0,1],sidenormal)
-            vtoextremez = sp.ucrss(sidenormal,equinox)
-            ### --- Cosine of angle between lastxyz and xyz
-            mindot = sp.vdot(lastxyz,xyz)
-            for none in [None,None]:
-              ### --- Two cases:  vtoextremez and -vtoextremez
-              ###     - Angles from vtoextremez to lastxyz and to xyz
-              ###       must be less than angle between lastxyz and xyz
-              ###       so cosines of those angles must be greater
-              lastxyzdot = sp.vdot(lastxyz,vtoextremez)
-              xyzdot = sp.vdot(xyz,vtoextremez)
-              if lastxyzdot>mindot and xyzdot>mindot:
-                ### --- Adjust maxdec and mindec as needed
-                try   : extremedec = dpr * math.asin(vtoextremez[2])
-                except: extremedec = dpr * sp.recrad(vtoextremez)[2]
-                if   extremedec > maxdec: maxdec = extremedec
-                elif extremedec < mindec: mindec = extremedec
-                break
-              ### --- Invert vtoextremez for next pass
-              vtoextremez = sp.vminus(vtoextremez)
-
-          ### - Adjust Dec limits as needed from Dec extrema of side
-          if maxdec > dechi: dechi = maxdec
-          if mindec < declo: declo = mindec
-          lastxyz = xyz
+        ### Each element of subfov comprises (RA,Dec) and vertex XYZ
+        ### - xyzs are unit vectors; lastxyzs are the preceding vertices
+        ras,decs = numpy.array([radec for radec,xyz in subfov],dtype=numpy.float64).T
+        xyzs = numpy.array([xyz for radec,xyz in subfov],dtype=numpy.float64)
+        lastxyzs = numpy.roll(xyzs,1,axis=0)
+
+        ### - Adjust RA and Dec limits as needed from RA,Decs of vertices
+        ralo,rahi = min(ralo,ras.min()),max(rahi,ras.max())
+        declo,dechi = min(declo,decs.min()),max(dechi,decs.max())
+
+        ### - Calculate Dec extrema of sides from lastxyzs to xyzs
+        ### -- Normals to planes of lastxyzs and xyzs
+        sidenormals = numpy.cross(lastxyzs,xyzs)
+        ### -- Z-rates along great circles at lastxyzs and at xyzs; if
+        ###    signs of Z-rates differ, there should be an extreme value
+        ###    between lastxyz and xyz
+        lastdzs = numpy.cross(sidenormals,lastxyzs)[:,2]
+        dzs = numpy.cross(sidenormals,xyzs)[:,2]
+        iextremes = numpy.nonzero(0.0 > (lastdzs*dzs))[0]
+        if len(iextremes):
+          sidenormals = sidenormals[iextremes]
+          lastxyzs,xyzs = lastxyzs[iextremes],xyzs[iextremes]
+          ### --- Get vectors perpendicular to side normals on equator
+          ### --- Use those to calculate unit vectors at Dec extremes
+          equinoxes = numpy.cross([0.,0.,1.],sidenormals)
+          vtoextremezs = vhats(numpy.cross(sidenormals,equinoxes))
+          ### --- Cosines of angles between lastxyzs and xyzs
+          mindots = (lastxyzs*xyzs).sum(axis=1)
+          ### --- Two cases:  vtoextremez and -vtoextremez
+          ###     - Angles from vtoextremez to lastxyz and to xyz
+          ###       must be less than angle between lastxyz and xyz
+          ###       so cosines of those angles must be greater
+          lastxyzdots = (lastxyzs*vtoextremezs).sum(axis=1)
+          xyzdots = (xyzs*vtoextremezs).sum(axis=1)
+          pluses = (lastxyzdots>mindots) & (xyzdots>mindots)
+          minuses = (-lastxyzdots>mindots) & (-xyzdots>mindots) & ~pluses
+          if (pluses|minuses).any():
+            ### --- Adjust Dec limits as needed from Dec extrema of sides
+            extremezs = numpy.where(pluses,vtoextremezs[:,2],-vtoextremezs[:,2])[pluses|minuses]
+            extremedecs = dpr * numpy.arcsin(numpy.clip(extremezs,-1.0,1.0))
+            declo,dechi = min(declo,extremedecs.min()),max(dechi,extremedecs.max())
 
         ### Append calculated RA,Dec box(es)
-        rdba((ralo,rahi,declo,dechi,))
+        boxes.append(tuple(map(float,(ralo,rahi,declo,dechi,))))
 
       ### Put None in .localxyzs, in .v_for_stellar_aberr, and in
-      ### .v_for_parallax; if no stellar aberration or parallax is
-      ### explicitly applied to define it later, then .localxyzs will be
-      ### calculated on the fly
+      ### .v_for_parallax
       self.localxyzs = None
       self.v_for_stellar_aberr = None
       self.v_for_parallax = None
 
+      ### Determine convexity, and inward side normals, once; for a
+      ### non-convex FOV, setup .localxyzs and .fovsides for the
+      ### crossing-count test
+      if not self.is_convex(): self.setup_localxyzs()
+
+    ### List, and (B,4) array for batched box tests, of RA,Dec boxes
+    self.radec_boxes = boxes
+    self._boxes_arr = numpy.asarray(self.radec_boxes,dtype=numpy.float64)
+
   ########################################################################
   def __repr__(self):
       if 1<self.L: return str(self.fovraws)
@@ -441,41 +466,59 @@ Argument vstar is either an RA,Dec pair (degrees) or a 3-vector
 
 """
 
+    if self.fovtype == FOV.CIRCLETYPE and 2==len(vstar):
+      ##################################################################
+      ### Reject RA,Dec star outside FOV Dec band before corrections;
+      ### widen band by bounds on Dec shift from corrections
+      margin = self._dec_margin
+      if not ((None is pmra_maspy) or (None is pmdec_maspy)):
+        margin += self._dec_pm_scale * math.hypot(pmra_maspy,pmdec_maspy)
+      if not (None is parallax_maspau):
+        margin += self._dec_parallax_scale * abs(parallax_maspau)
+      if not ((self._dec_min-margin) <= float(vstar[1]) <= (self._dec_max+margin)):
+        return False,None
+
     if self.fovtype == FOV.RADECBOXTYPE:
       ##################################################################
       ### Compare star vector to [RA,Dec] box
-      ra,dec = parse_inertial(vstar,return_radec=True)[:2]
+      ### - parse_inertial returns unit vector from inline trig
+      ra,dec,uvxyz = parse_inertial(vstar,return_radec=True)
       for ralo,rahi,declo,dechi in self.radec_boxes:
-        if ra<ralo: continue
-        if ra>rahi: continue
-        if dec<declo: continue
-        if dec>dechi: continue
-        return True,sp.radrec(1.,rpd*ra,rpd*dec)
+        if ralo<=ra<=rahi and declo<=dec<=dechi:
+          return True,uvxyz
       return False,None
 
-    ### Get inertial star unit vector without RA,Dec
-    uvinertial = uvraw = parse_inertial(vstar,return_radec=False)
+    ### Get inertial star unit vector without RA,Dec, as three floats;
+    ### 3-vector operations below are inline scalar arithmetic
+    x,y,z = map(float,parse_inertial(vstar,return_radec=False))
 
     ### Corrections for direction to star
     ### - Assume all corrections are small and can be applied in units
     ###   of radians to a unit vector in a plane perpendicular to the
     ###   vector to the star
 
+    ### - PM and parallax offsets are accumulated, then the corrected
+    ###   vector is normalized once; cf. .stars_in_fov
+    dx,dy,dz,do_any = 0.0,0.0,0.0,False
+
     ### - Proper Motion (PM)
     ###   - Uses PM in RA and Dec only, not radial velocity and parallax
     if (not (None is self.obs_year)
        ) and (not (None in (pmra_maspy,pmdec_maspy,))
        ) and (pmra_maspy != 0.0 or pmdec_maspy != 0.0):
-      ### - Unit vectors E and N in plane perpendicular to star vector
-      uveast = sp.ucrss([0,0,1],uvraw)
-      uvnorth = sp.ucrss(uvraw,uveast)
+      ### - Unit vectors E and N in plane perpendicular to star vector:
+      ###   E = [0,0,1] x star; N = star x E
+      ex,ey = -y,x
+      en = math.sqrt(ex*ex + ey*ey)
+      if en > 0.0: ex,ey = ex/en,ey/en
+      nx,ny,nz = -z*ey,z*ex,x*ey-y*ex
+      nn = math.sqrt(nx*nx + ny*ny + nz*nz)
+      if nn > 0.0: nx,ny,nz = nx/nn,ny/nn,nz/nn
       ### - Scale unit vectors in radians, and add to nominal vector
       ### - pmra_maspy from Gaia includes factor of secant(Declination)
-      uvinertial = sp.vhat(sp.vlcom3(self.obs_year*rpmas*pmdec_maspy,uvnorth
-                                    ,self.obs_year*rpmas*pmra_maspy,uveast
-                                    ,1.0,uvinertial
-                                    )
-                          )
+      dn = self._pm_scale*pmdec_maspy
+      de = self._pm_scale*pmra_maspy
+      dx,dy,dz,do_any = dn*nx+de*ex,dn*ny+de*ey,dn*nz,True
 
     ### - Parallax
     if (not (None is self.obs_pos)
@@ -484,58 +527,219 @@ Argument vstar is either an RA,Dec pair (degrees) or a 3-vector
       ### - Scale observer position, by parallax in mas/AU, then scale
       ###   to radians (since star vector is unit vector), make that the
       ###   new origin of the vector
-      uvinertial = sp.vhat(sp.vsub(uvinertial
-                                  ,sp.vscl(aupkm*parallax_maspau*rpmas,self.obs_pos)
-                                  )
-                          )
+      px,py,pz = self._parallax_scale_vec
+      dx,dy,dz,do_any = dx-parallax_maspau*px,dy-parallax_maspau*py,dz-parallax_maspau*pz,True
+
+    ### - Corrections are small, so norm is near unity
+    if do_any: x,y,z = vhat3_near_unit(x+dx,y+dy,z+dz)
 
     ### - Stellar Aberration
     if not (None is self.obs_vel):
       ### - Scale observer velocity by reciprocal of the speed of light,
       ###   add result to unit vector toward star.
-      uvinertial = sp.vhat(sp.vadd(uvinertial
-                                  ,sp.vscl(recip_clight,self.obs_vel)
-                                  )
-                          )
+      vx,vy,vz = self._aberr_vec
+      x,y,z = vhat3(x+vx,y+vy,z+vz)
+
+    uvinertial = numpy.array([x,y,z])
 
     if self.fovtype == FOV.CIRCLETYPE:
       ##################################################################
       ### Compare inertial star vector to circular FOV
-      return sp.vdot(uvinertial,self.uv_cone_axis) >= self.min_cosine,uvinertial
+      ax,ay,az = self.uv_cone_axis
+      return (x*ax + y*ay + z*az) >= self.min_cosine,uvinertial
 
     assert FOV.POLYGONTYPE == self.fovtype,'Unknown FOV type [{0}]'.format(self.fovtype)
 
     ####################################################################
     ### Compare star vector to polygonal FOV
 
-    if self.is_convex():
+    if self.convex:
       ### Convex FOV:  a negative dot product with the inward-pointing
       ###              normal to any side indicates star is outside FOV
-      for inwardnorm in self.inwardsidenorms:
-        if sp.vdot(uvinertial,inwardnorm) < 0.0: return False,uvinertial
+      for nx,ny,nz in self.inwardsidenorms:
+        if (x*nx + y*ny + z*nz) < 0.0: return False,uvinertial
 
       ### All dot products were non-negative:  star is within FOV
       return True,uvinertial
 
     ### Rotate inertial unit vector to local reference frame (reffrm)
-    uvlocalstar = self.rotate_to_local(uvinertial)
+    (m0x,m0y,m0z),(m1x,m1y,m1z),(m2x,m2y,m2z) = self.mtxtofov
+    zlocal = m2x*x + m2y*y + m2z*z
 
     ### Scale to Z=unity
-    if uvlocalstar[2] < 1e-15: return False,uvinertial
-    z1star = sp.vscl(1.0/uvlocalstar[2],uvlocalstar)
-
-    ### Setup .localxyzs and .fovsides
-    if None is self.localxyzs: self.setup_localxyzs()
+    if zlocal < 1e-15: return False,uvinertial
+    z1star = ((m0x*x + m0y*y + m0z*z) / zlocal
+             ,(m1x*x + m1y*y + m1z*z) / zlocal
+             ,)
 
     ### Count number of crossings of FOV sides
-    count = len([None
-                 for fovside in self.fovsides
-                 if fovside.right_of(z1star)
-                ])
+    if numba:
+      count = _count_right_of(self._side_m,self._side_b,self._side_xhi
+                             ,self._side_ylo,self._side_yhi,z1star[0],z1star[1]
+                             )
+    else:
+      count = sum(1 for fovside in self.fovsides if fovside.right_of(z1star))
 
     return ((count&1) and True or False),uvinertial
 
 
+  ########################################################################
+  def stars_in_fov(self
+                  ,ras
+                  ,decs
+                  ,parallaxes_maspau=None
+                  ,pmras_maspy=None
+                  ,pmdecs_maspy=None
+                  ):
+    """Vectorized .star_in_fov for a batch of N stars
+
+Arguments ras and decs are sequences of N RA and Dec values, degrees;
+optional arguments are sequences of N values, with None or NaN for
+stars without parallax or proper motion.
+
+Return:  N-element boolean array, True where star is in FOV
+         (N,3) array of corrected unit vectors
+
+"""
+    ras = numpy.asarray(ras,dtype=numpy.float64)
+    decs = numpy.asarray(decs,dtype=numpy.float64)
+    N = len(ras)
+
+    ### RA,Dec in radians; converted once, and trig is done once, either
+    ### below or in the compiled kernel
+    radras,raddecs = rpd*ras,rpd*decs
+
+    if self.fovtype == FOV.RADECBOXTYPE:
+      ##################################################################
+      ### Compare star RA,Decs to [RA,Dec] boxes
+      return self.stars_in_radec_box(ras,decs),radecs_to_uvs(radras,raddecs)
+
+    ### Corrections for direction to star; cf. .star_in_fov
+
+    if numba and ((None is not self.obs_year) or (None is not self.obs_pos) or (None is not self.obs_vel)):
+      ### - Compiled kernel does all corrections in one loop
+      nans = numpy.full(N,numpy.nan)
+      def nanarray(a): return nans if None is a else numpy.asarray(a,dtype=numpy.float64)
+      uvinertials = _corrections_kernel(radras,raddecs
+                                       ,nanarray(parallaxes_maspau)
+                                       ,nanarray(pmras_maspy)
+                                       ,nanarray(pmdecs_maspy)
+                                       ,numpy.zeros(3) if None is self.obs_pos else numpy.asarray(self.obs_pos,dtype=numpy.float64)
+                                       ,numpy.zeros(3) if None is self.obs_vel else numpy.array(self._aberr_vec)
+                                       ,0.0 if None is self.obs_year else self._pm_scale
+                                       ,aupkm * rpmas
+                                       ,None is not self.obs_year
+                                       ,None is not self.obs_pos
+                                       ,None is not self.obs_vel
+                                       )
+      return self.in_fov_corrected(uvinertials)
+
+    ### Uncorrected inertial star unit vectors
+    uvinertials = radecs_to_uvs(radras,raddecs)
+
+    ### PM and parallax offsets are accumulated into one (N,3) offset
+    ### array, and corrected stars are normalized once; to first order
+    ### this equals normalizing after each correction
+    duvs,do_any = numpy.zeros((N,3)),numpy.zeros(N,dtype=bool)
+
+    ### - Proper Motion (PM); stars without both PMs are not corrected
+    if not ((None is self.obs_year) or (None is pmras_maspy) or (None is pmdecs_maspy)):
+      pmras = numpy.asarray(pmras_maspy,dtype=numpy.float64)
+      pmdecs = numpy.asarray(pmdecs_maspy,dtype=numpy.float64)
+      do_pms = ~(numpy.isnan(pmras) | numpy.isnan(pmdecs))
+      do_pms &= (pmras != 0.0) | (pmdecs != 0.0)
+      if do_pms.any():
+        ### - Unit vectors E and N in plane perpendicular to star vector
+        uveasts = vhats(numpy.cross([0.,0.,1.],uvinertials))
+        uvnorths = vhats(numpy.cross(uvinertials,uveasts))
+        scale = self._pm_scale
+        duvs += ((scale*numpy.where(do_pms,pmdecs,0.0))[:,None] * uvnorths
+                +(scale*numpy.where(do_pms,pmras,0.0))[:,None] * uveasts
+                )
+        do_any |= do_pms
+
+    ### - Parallax
+    if not ((None is self.obs_pos) or (None is parallaxes_maspau)):
+      parallaxes = numpy.asarray(parallaxes_maspau,dtype=numpy.float64)
+      do_parallaxes = ~numpy.isnan(parallaxes) & (parallaxes != 0.0)
+      if do_parallaxes.any():
+        duvs -= numpy.where(do_parallaxes,parallaxes,0.0)[:,None] * numpy.array(self._parallax_scale_vec)
+        do_any |= do_parallaxes
+
+    if do_any.any():
+      uvinertials = numpy.where(do_any[:,None],vhats(uvinertials + duvs),uvinertials)
+
+    ### - Stellar Aberration; requires unit vectors, so it is not fused
+    if not (None is self.obs_vel):
+      uvinertials = vhats(uvinertials + numpy.array(self._aberr_vec))
+
+    return self.in_fov_corrected(uvinertials)
+
+
+  ########################################################################
+  def stars_in_radec_box(self,ras,decs):
+    """Return N-element boolean array, True where star RA,Dec pairs,
+degrees, are within any of the FOV RA,Dec boxes
+
+"""
+    ras = numpy.asarray(ras,dtype=numpy.float64)[:,None]
+    decs = numpy.asarray(decs,dtype=numpy.float64)[:,None]
+    boxes = self._boxes_arr
+    return ((ras>=boxes[:,0]) & (ras<=boxes[:,1])
+          & (decs>=boxes[:,2]) & (decs<=boxes[:,3])
+           ).any(axis=1)
+
+
+  ########################################################################
+  def in_fov_corrected(self,uvinertials):
+    """Test (N,3) array of corrected star unit vectors against circle or
+polygon FOV; cf. .stars_in_fov
+
+Return:  N-element boolean array, True where star is in FOV
+         (N,3) array of corrected unit vectors, i.e. uvinertials
+
+"""
+    if self.fovtype == FOV.CIRCLETYPE:
+      ##################################################################
+      ### Compare inertial star vectors to circular FOV
+      if numba: return _cone_contains(uvinertials,self.uv_cone_axis,self.min_cosine),uvinertials
+      return (uvinertials @ self.uv_cone_axis) >= self.min_cosine,uvinertials
+
+    assert FOV.POLYGONTYPE == self.fovtype,'Unknown FOV type [{0}]'.format(self.fovtype)
+
+    ####################################################################
+    ### Compare star vectors to polygonal FOV
+
+    if self.convex:
+      ### Convex FOV:  star is within FOV if dot products with all
+      ###              inward-pointing side normals are non-negative
+      if numba: return _convex_contains(uvinertials,self.inwardsidenorms_arr),uvinertials
+      return self.stars_in_convex_fov(uvinertials),uvinertials
+
+    ### Non-convex FOV:  reject stars outside bounding cone first, then
+    ###                   do exact crossing test on the remainder
+    in_fovs = (uvinertials @ numpy.asarray(self.uvavg)) >= self.bounding_min_cosine
+    icones = numpy.nonzero(in_fovs)[0]
+    if not len(icones): return in_fovs,uvinertials
+
+    ### Rotate inertial unit vectors to local reference frame (reffrm)
+    uvlocalstars = self.rotate_many(uvinertials[icones])
+
+    ### Scale to Z=unity; exclude vectors with Z too small
+    in_cones = uvlocalstars[:,2] >= 1e-15
+    zs = numpy.where(in_cones,uvlocalstars[:,2],1.0)
+    xs,ys = uvlocalstars[:,0]/zs,uvlocalstars[:,1]/zs
+
+    ### Count number of crossings of FOV sides; odd count is inside
+    xs,ys = xs[:,None],ys[:,None]
+    counts = ((ys >= self._side_ylo) & (ys < self._side_yhi) & (xs <= self._side_xhi)
+            & (xs <= ((ys * self._side_m) + self._side_b))
+             ).sum(axis=1)
+
+    in_fovs[icones] = in_cones & (1 == (counts&1))
+    return in_fovs,uvinertials
+
+
   ########################################################################
   def is_convex(self):
 
@@ -583,23 +787,49 @@ Argument vstar is either an RA,Dec pair (degrees) or a 3-vector
       else     : self.inwardsidenorms.append(sp.vminus(norm))
 
     self.convex = onepos ^ oneneg
+    ### (S,3) contiguous array of side normals for batched tests
+    self.inwardsidenorms_arr = numpy.array(self.inwardsidenorms,dtype=numpy.float64)
     return self.convex
 
 
+  ########################################################################
+  def stars_in_convex_fov(self,uvstars):
+    """Return N-element boolean array, True where (N,3) unit vectors
+uvstars are within convex polygonal FOV
+
+"""
+    assert self.is_convex(),'FOV.stars_in_convex_fov() method must be called from a convex polygon FOV'
+    return (numpy.asarray(uvstars) @ self.inwardsidenorms_arr.T >= 0.0).all(axis=1)
+
+
   ########################################################################
   def setup_localxyzs(self):
     """Scale unit vectors to Z=unity; build FOV sides"""
-    self.localxyzs = [sp.vscl(1.0/v[2],v) for v in self.uvlclxyzs]
+    self.localxyzs = self.uvlclxyzs / self.uvlclxyzs[:,2:3]
     self.fovsides = list()
     lastxyz = self.localxyzs[-1]
     for xyz in self.localxyzs:
       self.fovsides.append(FOVSIDE(xyz,lastxyz))
       lastxyz = xyz
+    ### FOV side parameters as arrays of length S, for compiled and
+    ### batched crossing counts
+    for attr in 'm b xhi ylo yhi'.split():
+      setattr(self,'_side_'+attr,numpy.array([getattr(fovside,attr) for fovside in self.fovsides],dtype=numpy.float64))
 
   ########################################################################
   def rotate_to_local(self,vxyz):
     """Utility to rotation from inertial frame to local frame"""
-    return sp.mxv(self.mtxtofov,vxyz)
+    (m0x,m0y,m0z),(m1x,m1y,m1z),(m2x,m2y,m2z) = self.mtxtofov.tolist()
+    x,y,z = vxyz
+    return (m0x*x + m0y*y + m0z*z
+           ,m1x*x + m1y*y + m1z*z
+           ,m2x*x + m2y*y + m2z*z
+           ,)
+
+  ########################################################################
+  def rotate_many(self,vxyzs):
+    """Rotate (N,3) array of vectors from inertial frame to local frame"""
+    return numpy.asarray(vxyzs,dtype=numpy.float64) @ self.mtxtofov.T
 
   ########################################################################
   def setup_stellar_aberration(self,observer_velocity_xyz):
@@ -663,6 +893,163 @@ side.
     if x > ((y * self.m) + self.b): return False
     return True
 
+########################################################################
+def vhat3(x,y,z):
+  """Scale 3-vector, as three floats, to unit length; zero stays zero"""
+  norm = math.sqrt(x*x + y*y + z*z)
+  if norm > 0.0:
+    inv = 1.0 / norm
+    return x*inv,y*inv,z*inv
+  return x,y,z
+
+########################################################################
+def vhat3_near_unit(x,y,z):
+  """Scale 3-vector, as three floats, with length near unity, to unit
+length; avoids sqrt when |length**2 - 1| < 1e-5, where the second-order
+expansion of 1/sqrt(1+d) is exact to roundoff
+
+"""
+  d = (x*x + y*y + z*z) - 1.0
+  if -1e-5 < d < 1e-5:
+    inv = 1.0 - d*(0.5 - 0.375*d)
+    return x*inv,y*inv,z*inv
+  return vhat3(x,y,z)
+
+########################################################################
+def vhats(vs):
+  """Scale each row of (N,3) array to unit length; zero rows stay zero"""
+  vs = numpy.asarray(vs,dtype=numpy.float64)
+  norms = numpy.sqrt((vs*vs).sum(axis=1))
+  return vs / numpy.where(norms > 0.0,norms,1.0)[:,None]
+
+########################################################################
+def radecs_to_uvs(radras,raddecs):
+  """Convert arrays of N RAs and Decs, radians, to (N,3) unit vectors"""
+  cosdecs = numpy.cos(raddecs)
+  return numpy.stack((cosdecs*numpy.cos(radras)
+                     ,cosdecs*numpy.sin(radras)
+                     ,numpy.sin(raddecs)
+                     ,),axis=1)
+
+########################################################################
+def _corrections_kernel(ras,decs,parallaxes,pmras,pmdecs
+                       ,obs_pos,obs_vel,pm_scale,plx_scale
+                       ,do_pm,do_plx,do_aberr
+                       ):
+  """Corrected unit vectors of N stars, in a single loop; cf. .stars_in_fov
+
+Arguments ras,decs are N-element arrays of radians; parallaxes, pmras,
+pmdecs are N-element arrays of mas/AU and mas/y, NaN where unknown;
+obs_pos and obs_vel are 3-element arrays; pm_scale is y*radian/mas;
+plx_scale is radian/mas * AU/km; do_* are booleans
+
+Return:  (N,3) array of corrected unit vectors
+
+Compiled with Numba, if Numba is available
+
+"""
+  N = ras.shape[0]
+  uvs = numpy.empty((N,3))
+  for i in prange(N):
+    cosdec = math.cos(decs[i])
+    x = cosdec * math.cos(ras[i])
+    y = cosdec * math.sin(ras[i])
+    z = math.sin(decs[i])
+
+    ### - Proper Motion (PM) and parallax offsets are accumulated, then
+    ###   normalized once; cf. FOV.stars_in_fov
+    dx,dy,dz,do_any = 0.0,0.0,0.0,False
+
+    ### - Proper Motion (PM); stars without both PMs are not corrected
+    pmra,pmdec = pmras[i],pmdecs[i]
+    if do_pm and not (math.isnan(pmra) or math.isnan(pmdec)) and (pmra != 0.0 or pmdec != 0.0):
+      ### - Unit vectors E and N in plane perpendicular to star vector
+      ex,ey = -y,x
+      en = math.sqrt(ex*ex + ey*ey)
+      if en > 0.0: ex,ey = ex/en,ey/en
+      nx,ny,nz = -z*ey,z*ex,x*ey-y*ex
+      nn = math.sqrt(nx*nx + ny*ny + nz*nz)
+      if nn > 0.0: nx,ny,nz = nx/nn,ny/nn,nz/nn
+      dn,de = pm_scale*pmdec,pm_scale*pmra
+      dx,dy,dz,do_any = dn*nx+de*ex,dn*ny+de*ey,dn*nz,True
+
+    ### - Parallax
+    parallax = parallaxes[i]
+    if do_plx and not math.isnan(parallax) and parallax != 0.0:
+      scale = plx_scale * parallax
+      dx,dy,dz,do_any = dx-scale*obs_pos[0],dy-scale*obs_pos[1],dz-scale*obs_pos[2],True
+
+    if do_any:
+      x,y,z = x+dx,y+dy,z+dz
+      vn = math.sqrt(x*x + y*y + z*z)
+      if vn > 0.0: x,y,z = x/vn,y/vn,z/vn
+
+    ### - Stellar Aberration
+    if do_aberr:
+      x,y,z = x+obs_vel[0],y+obs_vel[1],z+obs_vel[2]
+      vn = math.sqrt(x*x + y*y + z*z)
+      if vn > 0.0: x,y,z = x/vn,y/vn,z/vn
+
+    uvs[i,0],uvs[i,1],uvs[i,2] = x,y,z
+
+  return uvs
+
+########################################################################
+def _cone_contains(uvs,uv_axis,min_cosine):
+  """Return N-element boolean array, True where (N,3) unit vectors uvs
+are within cone around uv_axis; compiled with Numba, if available
+
+"""
+  N = uvs.shape[0]
+  in_fovs = numpy.empty(N,dtype=numpy.bool_)
+  for i in prange(N):
+    in_fovs[i] = (uvs[i,0]*uv_axis[0] + uvs[i,1]*uv_axis[1] + uvs[i,2]*uv_axis[2]) >= min_cosine
+  return in_fovs
+
+########################################################################
+def _convex_contains(uvs,inwardsidenorms):
+  """Return N-element boolean array, True where (N,3) unit vectors uvs
+are within convex polygon with (E,3) inward-pointing side normals;
+compiled with Numba, if available
+
+"""
+  N,E = uvs.shape[0],inwardsidenorms.shape[0]
+  in_fovs = numpy.empty(N,dtype=numpy.bool_)
+  for i in prange(N):
+    inside = True
+    for j in range(E):
+      if (uvs[i,0]*inwardsidenorms[j,0] + uvs[i,1]*inwardsidenorms[j,1] + uvs[i,2]*inwardsidenorms[j,2]) < 0.0:
+        inside = False
+        break
+    in_fovs[i] = inside
+  return in_fovs
+
+########################################################################
+def _count_right_of(ms,bs,xhis,ylos,yhis,x,y):
+  """Return count of FOV sides, as arrays of FOVSIDE parameters, that
+are right of point x,y on the plane Z=1; cf. FOVSIDE.right_of; compiled
+with Numba, if available
+
+"""
+  count = 0
+  for j in range(ms.shape[0]):
+    if ylos[j] <= y < yhis[j] and x <= xhis[j] and x <= ((y * ms[j]) + bs[j]):
+      count += 1
+  return count
+
+if numba:
+  prange = numba.prange
+  ### - Fastmath without nnan/ninf, which would let LLVM drop the isnan
+  ###   tests that skip NULL PM and parallax values
+  _corrections_kernel = numba.njit(parallel=True,fastmath={'contract','arcp','reassoc'},cache=True)(_corrections_kernel)
+  ### - No fastmath:  containment at FOV boundary must not depend on
+  ###   reassociation of the dot products
+  _cone_contains = numba.njit(parallel=True,cache=True)(_cone_contains)
+  _convex_contains = numba.njit(parallel=True,cache=True)(_convex_contains)
+  _count_right_of = numba.njit(cache=True)(_count_right_of)
+else:
+  prange = range
+
 ########################################################################
 def parse_inertial(input_vertex, return_radec=True):
   """Parse input vertex as either RA,Dec or XYZ;
@@ -674,7 +1061,10 @@ Return RA,DEC (optional) and unit vector
     ra,dec = map(float,input_vertex)
     assert ra<=360.0 and ra>=0.0,'RA ({0}) is out of range [0,360)'.format(ra)
     assert dec<=90.0 and dec>=-90.0,'RA ({0}) is out of range [-90,+90]'.format(dec)
-    uvxyz = sp.radrec(1.0,ra*rpd,dec*rpd)
+    ### Inline RA,Dec to unit vector; cf. SPICE RADREC
+    ra_rad,dec_rad = ra*rpd,dec*rpd
+    cosdec = math.cos(dec_rad)
+    uvxyz = numpy.array((cosdec*math.cos(ra_rad),cosdec*math.sin(ra_rad),math.sin(dec_rad),))
   else:
     ### Vertex has three items:  assume they are XYZ
     assert 3==len(input_vertex),'XYZ input vector [{0}] for vertex does not have 3 elements'.format(str(input_vertex))
@@ -683,3 +1073,14 @@ Return RA,DEC (optional) and unit vector
 
   if return_radec: return ra,dec,uvxyz
   return uvxyz
+
+########################################################################
+def parse_inertial_batch(ras,decs):
+  """Convert sequences of N RAs and Decs, degrees, to unit vectors;
+cf. parse_inertial
+Return (N,3) C-contiguous float64 array
+
+"""
+  return numpy.ascontiguousarray(radecs_to_uvs(rpd*numpy.asarray(ras,dtype=numpy.float64)
+                                              ,rpd*numpy.asarray(decs,dtype=numpy.float64)
+                                              ))
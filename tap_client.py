@@ -0,0 +1,107 @@
+"""
+Client for ESA/Gaia TAP web API
+
+"""
+import urllib3
+import collections
+try: import certifi
+except: certifi = None
+try: import orjson
+except: orjson = None
+try: import simplejson as sj
+except: import json as sj
+### JSON parser for TAP responses, chosen once; both accept bytes
+loads = orjson.loads if orjson else sj.loads
+
+### Shared connection pool; keeps TCP+TLS connection to TAP server warm
+### across queries
+POOL = urllib3.PoolManager(maxsize=4
+                          ,block=True
+                          ,retries=urllib3.Retry(3,backoff_factor=0.5)
+                          ,headers={'Connection':'keep-alive'}
+                          ,**(dict(cert_reqs='CERT_REQUIRED',ca_certs=certifi.where()) if certifi else dict())
+                          )
+
+### Query for ESA Gaia TAP web API:
+### - two brightest stars;
+### - in 2.9-degree circle around RA,Dec=1,2;
+### - proper motion correction to time 2016.5, 1y post Gaia DR2 epoch.
+
+QUERY="""
+SELECT source_id
+      ,ra
+      ,dec
+      ,array_element(arr,1) as rastar_corrected
+      ,array_element(arr,2) as decstar_corrected
+      ,pmra
+      ,pmdec
+      ,parallax
+      ,phot_g_mean_mag as mean_mag
+
+FROM (
+  SELECT TOP 2
+  source_id
+ ,ra
+ ,dec
+ ,pmra
+ ,pmdec
+ ,parallax
+ ,phot_g_mean_mag
+ ,epoch_prop(ra,dec,parallax,pmra,pmdec,radial_velocity,2015.5,2016.5) as arr
+
+  FROM gaiadr2.gaia_source
+
+  WHERE 1=CONTAINS(point('ICRS',ra,dec)
+                  ,CIRCLE('ICRS',1,2,2.9)
+                  )
+
+  ORDER BY PHOT_G_MEAN_MAG
+) as p
+;"""
+
+def intorflt(s):
+  """Convert string to int or to float"""
+  try: return int(s)
+  except: return float(s)
+
+### Converters for TAP metadata datatypes
+datatype_converters = dict(short=int,int=int,long=int,float=float,double=float)
+
+def make_row_cls(names):
+  """Return namedtuple class with a field for each column name"""
+  return collections.namedtuple('Row',names,rename=True)
+
+def get_tap_data(query=QUERY):
+  """Query data from ESA Gaia TAP web api; return dict with list of
+Row namedtuples, one per star, at key 'stars'
+
+"""
+  r = POOL.request('POST'
+                  ,"https://gea.esac.esa.int/tap-server/tap/sync"
+                  ,fields=dict(FORMAT='JSON'
+                              ,LANG='ADQL'
+                              ,REQUEST='doQuery'
+                              ,QUERY=query
+                              )
+                  ,preload_content=False
+                  )
+
+  ### N.B. not streamed:  the whole body is read into memory, then parsed
+  ### as bytes, without decoding to str first; preload_content=False
+  ### only skips urllib3's preloaded copy.  Return connection to pool
+  ### when done
+  try:
+    body = r.read()
+    rtn_dict = loads(body)
+  finally:
+    r.release_conn()
+  ### One converter per column, from its datatype; intorflt if unknown
+  RowCls = make_row_cls([d['name'] for d in rtn_dict['metadata']])
+  converters = [datatype_converters.get(d.get('datatype'),intorflt)
+                for d in rtn_dict['metadata']
+               ]
+  rtn_dict['stars'] = [RowCls(*[conv(v) for conv,v in zip(converters,row)])
+                       for row in rtn_dict['data']
+                      ]
+
+  return rtn_dict
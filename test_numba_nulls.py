@@ -0,0 +1,47 @@
+"""
+Compare Numba-compiled and NumPy corrections in gaiaif_util.py for
+stars with NULL (NaN) proper motions and/or parallax
+
+Usage:
+
+  python test_numba_nulls.py
+
+N.B. skipped, with a message, when Numba is not installed
+
+"""
+import sys
+import numpy
+import gaiaif_util as gifu
+
+if not gifu.numba:
+  print('Numba not installed; skipping')
+  sys.exit(0)
+
+### Stars around circle FOV axis; every other star has NULL PMs, every
+### third a NULL parallax, and some have both
+nan = numpy.nan
+N = 300
+rng = numpy.random.default_rng(20150)
+ras = 10.0 + rng.uniform(-2.,2.,N)
+decs = -45.0 + rng.uniform(-2.,2.,N)
+parallaxes = rng.uniform(0.,200.,N)
+pmras = rng.uniform(-500.,500.,N)
+pmdecs = rng.uniform(-500.,500.,N)
+pmras[::2] = nan
+pmdecs[::2] = nan
+parallaxes[::3] = nan
+
+fov = gifu.FOV([[10.,-45.],2.],obs_pos=[1e8,2e8,3e7],obs_vel=[30.,-5.,2.],obs_year=10.0)
+
+### Numba path, then NumPy path with the module's numba disabled
+in_numba,uv_numba = fov.stars_in_fov(ras,decs,parallaxes,pmras,pmdecs)
+numba,gifu.numba = gifu.numba,None
+try:
+  in_numpy,uv_numpy = fov.stars_in_fov(ras,decs,parallaxes,pmras,pmdecs)
+finally:
+  gifu.numba = numba
+
+### Stars with NULLs must be corrected, not dropped as NaN vectors
+assert not numpy.isnan(uv_numba).any()
+assert (in_numba == in_numpy).all()
+assert numpy.abs(uv_numba - uv_numpy).max() < 1e-12
@@ -11,7 +11,9 @@ import spiceypy as sp
 import gaiaif_util as gifu
 
 ### Setup debugging and conversions; define some string constants
+### - STRICT enables extra, costly, consistency checks
 do_debug = 'DEBUG' in os.environ
+do_strict = 'STRICT' in os.environ
 rpd,aupkm = sp.rpd(),sp.convrt(1.,'km','au')
 (earth,ssb,j2000,none,LT,LTS,ra_dec,declination,equals
 ,) = 'earth 0 j2000 none lt lt+s ra/dec declination ='.upper().split()
@@ -39,8 +41,16 @@ if do_debug:
   assert 0.0==sp.vnormg(sp.vaddg(ssb2e,e2ssblt,6),6)
 
 ### Get a star (ra,dec,parallax) near the pole with parallax > 10mas/y
-cn=sl3.connect(gaia_db)
+cn=sl3.connect('file:{0}?mode=ro&immutable=1'.format(gaia_db),uri=True)
+cn.row_factory = sl3.Row
 cu=cn.cursor()
+### Read-only; large page cache and memory-mapped I/O
+for pragma in ('query_only=1'
+              ,'mmap_size={0}'.format(1<<30)
+              ,'cache_size=-262144'
+              ,'temp_store=MEMORY'
+              ,):
+  cu.execute('PRAGMA {0}'.format(pragma))
 cu.execute("""
 SELECT gr.idoffset
       ,gl.ra
@@ -55,9 +65,10 @@ ORDER BY gl.dec DESC
 LIMIT 1
 ;""")
 
-idoffset,ra,dec,parallax = result = list(cu.fetchone())
+row = cu.fetchone()
+idoffset,ra,dec,parallax = row['idoffset'],row['ra'],row['dec'],row['parallax']
 
-if do_debug: print(dict(zip([d[0] for d in cu.description],result)))
+if do_debug: print(dict(zip(row.keys(),row)))
 
 ### Setup one gaiaif_util.FOV instance with only a parallax correction,
 ### and another with parallax and stellar aberration corrections
@@ -66,10 +77,10 @@ if do_debug: print(dict(zip([d[0] for d in cu.description],result)))
 fov_noab = gifu.FOV([[0.,90.],5.],obs_pos=ssb2e[:3])
 fov_ab = gifu.FOV([[0.,90.],5.],obs_pos=ssb2e[:3],obs_vel=ssb2e[3:])
 
-### Call .star_in_fov with the current near-pole star to get corrected
-### positions
-in_noab,uvstar_noab = fov_noab.star_in_fov([ra,dec],parallax_maspau=parallax)
-in_ab,uvstar_ab = fov_ab.star_in_fov([ra,dec],parallax_maspau=parallax)
+### Call batched .stars_in_fov with the current near-pole star, as a
+### batch of one, to get corrected positions
+(in_noab,),(uvstar_noab,) = fov_noab.stars_in_fov([ra],[dec],parallaxes_maspau=[parallax])
+(in_ab,),(uvstar_ab,) = fov_ab.stars_in_fov([ra],[dec],parallaxes_maspau=[parallax])
 
 ### Ensure both stars were in the FOVs
 assert in_noab and in_ab
@@ -92,7 +103,7 @@ earth2star_lts = sp.spkcpt(vstar,ssb,j2000
                           ,"earth"
                           )[0]
 
-if do_debug:
+if do_strict:
   ### Ensure that light-time correction is zero for earth->star vector
   ### for star at fixed positon relative to SSB
   earth2star_lt   = sp.spkcpt(vstar,ssb,j2000
@@ -5,80 +5,9 @@ for proper motion correction
 """
 import os
 import sys
-import urllib3
+import numpy
 import fov_cmd
-try: import simplejson as sj
-except: import json as sj
-
-httppool = urllib3.PoolManager()
-
-### Query for ESA Gaia TAP web API:
-### - two brightest stars;
-### - in 2.9-degree circle around RA,Dec=1,2;
-### - proper motion correction to time 2016.5, 1y post Gaia DR2 epoch.
-
-QUERY="""
-SELECT source_id
-      ,ra
-      ,dec
-      ,array_element(arr,1) as rastar_corrected
-      ,array_element(arr,2) as decstar_corrected
-      ,pmra
-      ,pmdec
-      ,parallax
-      ,phot_g_mean_mag as mean_mag
-
-FROM (
-  SELECT TOP 2
-  source_id
- ,ra
- ,dec
- ,pmra
- ,pmdec
- ,parallax
- ,phot_g_mean_mag
- ,epoch_prop(ra,dec,parallax,pmra,pmdec,radial_velocity,2015.5,2016.5) as arr
-
-  FROM gaiadr2.gaia_source
-
-  WHERE 1=CONTAINS(point('ICRS',ra,dec)
-                  ,CIRCLE('ICRS',1,2,2.9)
-                  )
-
-  ORDER BY PHOT_G_MEAN_MAG
-) as p
-;"""
-
-def intorflt(s):
-  """Convert string to int or to float"""
-  try: return int(s)
-  except: return float(s)
-
-class GENERIC(dict):
-  """Dict class with attributer for each key"""
-  def __init__(self,names,vals):
-    self.update(dict(zip(names,map(intorflt,vals))))
-    for name in self:
-      setattr(self,name,intorflt(self[name]))
-
-def get_tap_data():
-  """Query data from ESA Gaia TAP web api; return list of dicts"""
-  r = httppool.request('POST'
-                      ,"https://gea.esac.esa.int/tap-server/tap/sync"
-                      ,fields=dict(FORMAT='JSON'
-                                  ,LANG='ADQL'
-                                  ,REQUEST='doQuery'
-                                  ,QUERY=QUERY
-                                  )
-                      )
-
-  rtn_dict = sj.loads(r.data.decode('utf-8'))
-  names = [d['name'] for d in rtn_dict['metadata']]
-  rtn_dict['stars'] = [GENERIC(names,row)
-                       for row in rtn_dict['data']
-                      ]
-
-  return rtn_dict
+from tap_client import get_tap_data
 
 if "__main__" == __name__:
   import pprint
@@ -91,18 +20,19 @@ if "__main__" == __name__:
     ### Make similar query local data from SQLite3 database (DB)
     sl3_data = fov_cmd.do_main('1,2 2.9 --magtype=g --limit=2 --obsy=2016.5'.split())
 
-    ### Get GENERIC class instances from each
+    ### Get TAP Row namedtuples, and SQLite3 dicts, of stars
     tap_stars,sl3_stars = [d['stars'] for d in (tap_data,sl3_data,)]
+    N = min(len(tap_stars),len(sl3_stars))
 
     ### Store differences greater than 2e-12 in values of matching keys
-    keys = set(tap_stars[0].keys()).intersection(set(sl3_stars[0].keys()))
-    diffs=[dict(zip(keys,[sl3row[key]-taprow[key]
-                          for key in keys
-                          if abs(sl3row[key]-taprow[key])>2e-12
-                         ]
-                   )
-               )
-           for taprow,sl3row in zip(tap_stars,sl3_stars)
+    ### - One array of differences per key, over all stars
+    keys = sorted(set(tap_stars[0]._fields).intersection(set(sl3_stars[0].keys())))
+    deltas = dict([(key,numpy.array([row[key] for row in sl3_stars[:N]])
+                       -numpy.array([getattr(row,key) for row in tap_stars[:N]])
+                   ,) for key in keys])
+    bigs = dict([(key,numpy.abs(deltas[key])>2e-12,) for key in keys])
+    diffs=[dict([(key,deltas[key][i],) for key in keys if bigs[key][i]])
+           for i in range(N)
           ]
 
     ### Test results:  all rows should be empty dicts
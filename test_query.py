@@ -11,9 +11,10 @@ Setup:
 
 """
 
-### Attach light and heavy DB files
-attach1 = "attach 'gaia.sqlite3' as lgt"
-attach2 = "attach 'gaia_heavy.sqlite3' as hvy"
+### Attach light and heavy DB files, read-only and immutable, i.e. no
+### locking or change detection
+attach1 = "attach 'file:gaia.sqlite3?mode=ro&immutable=1' as lgt"
+attach2 = "attach 'file:gaia_heavy.sqlite3?mode=ro&immutable=1' as hvy"
 
 ### Select query with JOIN*:  ID offset*; RA; Dec; Source ID; Parallax.
 ### - WHERE clause limits returned rows to stars at high Declination
@@ -41,11 +42,18 @@ ORDER BY hvy.gaiaheavy.source_id
 
 import sqlite3 as sl3
 
-### SQLite3 setup
-cn = sl3.connect('')
+### SQLite3 setup; uri=True so ATTACH accepts URI filenames
+cn = sl3.connect('file::memory:',uri=True)
 cu = cn.cursor()
 cu.execute(attach1)
 cu.execute(attach2)
+### Read-only; large page cache and memory-mapped I/O for each DB file
+### - N.B. cache_size and mmap_size are per attached schema
+cu.execute('PRAGMA query_only=1')
+cu.execute('PRAGMA temp_store=MEMORY')
+for schema in ('lgt','hvy',):
+  cu.execute('PRAGMA {0}.mmap_size={1}'.format(schema,1<<30))
+  cu.execute('PRAGMA {0}.cache_size=-262144'.format(schema))
 
 ### Make the query
 cu.execute(select1)
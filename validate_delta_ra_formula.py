@@ -25,8 +25,11 @@ Derivation
 import os
 import sys
 import math
+import numpy
 import spiceypy as sp
-import traceback as tb
+
+try: import numba
+except: numba = None
 
 do_debug = 'DEBUG' in os.environ
 
@@ -68,39 +71,60 @@ vcone0 = sp.vrotv(vx,vz,hangrad)
 ##    be rotated by angle -Declination around +Y axis, and their RA
 ##    calculated to estimate the half-RA at that declination
 ##    - Use cosine to oversample rotations near 0 and PI/2
-vcones = [sp.vrotv(vcone0,vx,sp.halfpi()*(1+math.cos(sp.pi()*i/1e3))/2) for i in range(1000)]
+##    - Constants and functions bound once, outside comprehension
+halfpi,pi,vrotv,cos = sp.halfpi(),sp.pi(),sp.vrotv,math.cos
+vcones = [vrotv(vcone0,vx,halfpi*(1+cos(pi*i/1e3))/2) for i in range(1000)]
+### - Stack as (1000,3) array, to rotate all of them with one matmul
+VCONES = numpy.array(vcones,dtype=numpy.float64)
+
+########################################################################
+def halfraest_kernel(vcones,decrad):
+  """Return maximum RA, radians, of (N,3) cone vectors rotated by
+-decrad around +Y; compiled with Numba, if available
+
+"""
+  c,s = math.cos(-decrad),math.sin(-decrad)
+  maxra = -math.pi
+  for i in range(vcones.shape[0]):
+    ### Rotation around +Y leaves Y unchanged
+    ra = math.atan2(vcones[i,1],c*vcones[i,0] + s*vcones[i,2])
+    if ra > maxra: maxra = ra
+  return maxra
+
+if numba:
+  halfraest_kernel = numba.njit('f8(f8[:,::1],f8)',cache=True,fastmath=True)(halfraest_kernel)
 
 ########################################################################
-### Initialize output list, loop over declinations
+### Keep only declinations where (Dec + cone-half-angle) is less than
+### 90; at and beyond that the sqrt argument in the formula below is
+### not positive.  Declinations increase, so this keeps a leading slice
+valid_trigdecs = [(tansqdec,cosdec,decrad,)
+                  for tansqdec,cosdec,decrad in trigdecs
+                  if 0.0 < (1.0 - (tansqdec * tansqhang))
+                 ]
+
+### Initialize output list, loop over valid declinations
 halfras = list()
-for tansqdec,cosdec,decrad in trigdecs:
-  try:
-
-    ### Apply formula at this Dec(lination) and cone half-angle (hang)
-    ### to get half-RA
-    ###   arctan( sqrt(1-(tan(Dec)*tan(hang)**2)) / (cos(dec)*cos(hang))
-    T = sinhang / math.sqrt(1.0 - (tansqdec * tansqhang))
-    halfracalc = dpr * math.atan(T / (cosdec * coshang))
-
-    ### Make estimate of same via the maximum RA of many cone vectors
-    ### rotated by -Dec around Y
-    halfraest = dpr * max([sp.recrad(sp.vrotv(vcone,vy,-decrad))[1]
-                            for vcone in vcones
-                           ])
-
-    ### Append results to output list
-    halfras.append((halfracalc-halfraest,halfracalc,halfraest,))
-
-  except ValueError as e:
-    ### At the point when the sum of (Dec + cone-half-angle) is 90 or
-    ### more, the sqrt argument will be negative; confirm that is the
-    ### case and exit the loop
-    if do_debug: tb.print_exc()
-    assert 1e-12 > (sp.halfpi() - (decrad+hangrad))
-    break
-  except:
-    ### Re-raise any other exception
-    raise
+for tansqdec,cosdec,decrad in valid_trigdecs:
+
+  ### Apply formula at this Dec(lination) and cone half-angle (hang)
+  ### to get half-RA
+  ###   arctan( sqrt(1-(tan(Dec)*tan(hang)**2)) / (cos(dec)*cos(hang))
+  T = sinhang / math.sqrt(1.0 - (tansqdec * tansqhang))
+  halfracalc = dpr * math.atan(T / (cosdec * coshang))
+
+  ### Make estimate of same via the maximum RA of many cone vectors
+  ### rotated by -Dec around Y; cf. SPICE VROTV and RECRAD
+  if numba:
+    halfraest = dpr * halfraest_kernel(VCONES,decrad)
+  else:
+    c,s = math.cos(-decrad),math.sin(-decrad)
+    R = numpy.array([[c,0.,s],[0.,1.,0.],[-s,0.,c]])
+    rot = VCONES @ R.T
+    halfraest = dpr * float(numpy.arctan2(rot[:,1],rot[:,0]).max())
+
+  ### Append results to output list
+  halfras.append((halfracalc-halfraest,halfracalc,halfraest,))
 
 ########################################################################
 ### Truncate input declinations list, output results
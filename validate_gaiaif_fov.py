@@ -1,6 +1,7 @@
 import os
 import sys
 import math
+import numpy
 import gaiaif_util
 import spiceypy as sp
 
@@ -24,39 +25,38 @@ if "__main__" == __name__:
     if fov.POLYGONTYPE == fov.fovtype:
       print(dict(fov_is_convex=fov.is_convex()))
 
-    def inbox(ra,dec):
-      for ralo,rahi,declo,dechi in radec_boxes:
-        if ra<ralo: continue
-        if ra>rahi: continue
-        if dec<declo: continue
-        if dec>dechi: continue
-        return True
-      return False
-
     count = 650
     countplus = count + 1
 
     dtheta = 360.0 / count
     dphi = 2.0 / count
-    ras = [i*dtheta for i in range(count)]*countplus
-    decs = sum([[88+(i*dphi)]*count for i in range(countplus)],[])
-    rtn = [(fov.star_in_fov(radec),radec,) for radec in zip(ras,decs) if inbox(*radec)]
+    ### Grid of RA,Dec pairs, RA varying fastest; keep pairs in boxes
+    ras,decs = [a.ravel() for a in numpy.meshgrid(numpy.arange(count)*dtheta
+                                                 ,88+(numpy.arange(countplus)*dphi)
+                                                 )]
+    inboxes = fov.stars_in_radec_box(ras,decs)
+    ### Test all in-box pairs against the FOV in one batch
+    insides,uvstars = fov.stars_in_fov(ras[inboxes],decs[inboxes])
 
-    print(len(rtn))
+    print(len(insides))
 
     if not ('--no-plot' in sys.argv[1:]):
       import matplotlib.pyplot as plt
 
-      xs,ys,zs = zip(*[sp.radrec(1.,*sp.vsclg(rpd,radec,2)) for (inside,uvstar,),radec in rtn if inside])
+      ### Unit vector X,Y components of in-box RA,Decs
+      radras,raddecs = rpd*ras[inboxes],rpd*decs[inboxes]
+      cosdecs = numpy.cos(raddecs)
+      allxs,allys = cosdecs*numpy.cos(radras),cosdecs*numpy.sin(radras)
+      xs,ys = allxs[insides],allys[insides]
 
       plt.axhline(0,color='lightgray')
       plt.axvline(0,color='lightgray')
 
-      if len(xs) < len(rtn):
-        outxs,outys,outzs = zip(*[sp.radrec(1.,*sp.vsclg(rpd,radec,2)) for (inside,uvstar,),radec in rtn if not inside])
-        plt.plot([x/rpd for x in outxs],[y/rpd for y in outys],',r',label='Outside FOV')
+      if len(xs) < len(insides):
+        outxs,outys = allxs[~insides],allys[~insides]
+        plt.plot(outxs/rpd,outys/rpd,',r',label='Outside FOV')
 
-      plt.plot([x/rpd for x in xs],[y/rpd for y in ys],'.g',markersize=.3,label='Inside FOV')
+      plt.plot(xs/rpd,ys/rpd,'.g',markersize=.3,label='Inside FOV')
       plt.xlabel('Colatitude wrt PM, ~deg')
       plt.ylabel('Colatitude wrt RA=+90deg Meridian, ~deg')
       plt.legend()